@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 
 DEFAULT_ASSETS = {
     "airhorn": "assets/airhorn.mp3",
@@ -8,16 +9,25 @@ DEFAULT_ASSETS = {
     "hitmarker": "assets/hitmarker.mp3",
 }
 
-def resolve_assets(custom_paths=None):
-    """
-    Return a dict of asset paths. custom_paths may override DEFAULT_ASSETS keys.
-    """
-    assets = DEFAULT_ASSETS.copy()
-    if custom_paths:
-        assets.update(custom_paths)
+def _absolute(assets):
     # Expand to absolute paths and validate existence where possible
     for k, p in list(assets.items()):
         if not os.path.isabs(p):
             p = os.path.abspath(p)
         assets[k] = p
-    return assets
\ No newline at end of file
+    return assets
+
+@lru_cache(maxsize=1)
+def _default_assets():
+    return _absolute(DEFAULT_ASSETS.copy())
+
+def resolve_assets(custom_paths=None):
+    """
+    Return a dict of asset paths. custom_paths may override DEFAULT_ASSETS keys.
+    The default set is resolved once and a fresh copy is returned on every call.
+    """
+    if not custom_paths:
+        return dict(_default_assets())
+    assets = DEFAULT_ASSETS.copy()
+    assets.update(custom_paths)
+    return _absolute(assets)
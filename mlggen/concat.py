@@ -1,6 +1,69 @@
+import os
+import subprocess
+import tempfile
 from moviepy.editor import concatenate_videoclips, VideoFileClip
+from mlggen.ffmpeg_utils import ffmpeg_binary, probe_streams, pick_h264_encoder, write_videofile_kwargs
+
+def _stream_signature(path):
+    """
+    Codec/format fields that must match across inputs for a stream-copy concat.
+    Besides codec/size/rate this includes the H.264 profile/level (decoder setup
+    comes from the first file's headers), time_base and SAR, which a copy cannot
+    reconcile. Returns None if the file could not be probed.
+    """
+    streams = probe_streams(path)
+    if not streams:
+        return None
+    sig = []
+    for st in streams:
+        kind = st.get("codec_type")
+        if kind == "video":
+            sig.append((kind, st.get("codec_name"), st.get("profile"), st.get("level"),
+                        st.get("width"), st.get("height"), st.get("pix_fmt"), st.get("sample_aspect_ratio"),
+                        st.get("r_frame_rate"), st.get("time_base")))
+        elif kind == "audio":
+            sig.append((kind, st.get("codec_name"), st.get("profile"), st.get("sample_rate"),
+                        st.get("channels"), st.get("time_base")))
+    return tuple(sig)
+
+def _concat_stream_copy(video_paths, output_path):
+    """
+    Join files with ffmpeg's concat demuxer and -c copy (no decode/re-encode).
+    Returns (ok, error) where error holds the last lines ffmpeg wrote to stderr.
+    """
+    fd, list_path = tempfile.mkstemp(suffix=".txt", prefix="mlggen_concat_")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for p in video_paths:
+                p = os.path.abspath(p).replace("\\", "/").replace("'", "'\\''")
+                f.write("file '{}'\n".format(p))
+        cmd = [ffmpeg_binary(), "-y", "-v", "error", "-f", "concat", "-safe", "0",
+               "-i", list_path, "-c", "copy", output_path]
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            return False, str(e)
+        err = result.stderr.decode("utf-8", "replace").strip().splitlines()
+        return result.returncode == 0, "\n".join(err[-5:])
+    finally:
+        os.remove(list_path)
+
+def concat_files(video_paths, output_path, codec=None, audio_codec="aac", copy_if_possible=True):
+    """
+    Concatenate video files into output_path.
+    When every input has the same codecs/size/fps (per ffprobe) the files are
+    joined by stream copy; otherwise they are re-encoded with moviepy using
+    codec/audio_codec. codec=None picks a hardware H.264 encoder when one works
+    (NVENC, VideoToolbox, QSV), else libx264, at its fastest preset.
+    """
+    if copy_if_possible and video_paths:
+        sigs = [_stream_signature(p) for p in video_paths]
+        if sigs[0] and all(s == sigs[0] for s in sigs):
+            ok, err = _concat_stream_copy(video_paths, output_path)
+            if ok:
+                return
+            print("Stream copy concat failed, re-encoding instead:", err or "(no ffmpeg output)")
 
-def concat_files(video_paths, output_path, codec="libx264", audio_codec="aac"):
     clips = []
     for p in video_paths:
         try:
@@ -11,6 +74,10 @@ def concat_files(video_paths, output_path, codec="libx264", audio_codec="aac"):
     if not clips:
         raise RuntimeError("No clips to concatenate")
     final = concatenate_videoclips(clips, method="compose")
-    final.write_videofile(output_path, codec=codec, audio_codec=audio_codec)
+    write_kwargs = {"codec": codec, "audio_codec": audio_codec}
+    if codec is None:
+        # Fastest preset of the chosen encoder: concat output is an intermediate
+        write_kwargs.update(write_videofile_kwargs(pick_h264_encoder(fast=True)))
+    final.write_videofile(output_path, **write_kwargs)
     for c in clips:
-        c.close()
\ No newline at end of file
+        c.close()
@@ -3,26 +3,64 @@
 # fallback resize used via clip.fl_image or when producing resized image overlays.
 import random
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
 import numpy as np
 from moviepy.editor import (
     CompositeVideoClip, ImageClip, AudioFileClip, concatenate_videoclips,
     VideoFileClip, afx, vfx, TextClip
 )
+from moviepy.audio.AudioClip import AudioArrayClip, CompositeAudioClip
 
 # Try to import Pillow (PIL). If it's not installed, fall back to moviepy-only behavior.
 try:
-    from PIL import Image as PILImage, ImageDraw, ImageFont
+    from PIL import Image as PILImage, ImageDraw, ImageFilter, ImageFont
+    from mlggen.pil_compat import RESAMPLE_LANCZOS, RESAMPLE_BILINEAR
     HAS_PIL = True
 except Exception:
     PILImage = None
     ImageDraw = None
+    ImageFilter = None
     ImageFont = None
+    RESAMPLE_LANCZOS = RESAMPLE_BILINEAR = None
     HAS_PIL = False
 
-def _safe_resize_array_nn(arr, new_w, new_h):
+def _imagemagick_available():
+    """
+    True if the ImageMagick binary moviepy's TextClip shells out to can be found.
+    Probed once at import, instead of letting every TextClip call try to launch it.
+    """
+    try:
+        from moviepy.config import get_setting
+        binary = get_setting("IMAGEMAGICK_BINARY")
+    except Exception:
+        binary = "convert"
+    return bool(binary) and binary != "unset" and shutil.which(binary) is not None
+
+_HAS_IMAGEMAGICK = _imagemagick_available()
+
+# Optional Numba kernels (HAS_NUMBA False -> pure numpy paths below)
+from mlggen.kernels import HAS_NUMBA, nn_resize, nn_resize_lut
+
+def _nn_indices(h, w, new_h, new_w):
+    """
+    Source row/column indices for a nearest-neighbor resize from (h, w) to (new_h, new_w).
+    Computed once per target size so per-frame work is only the gather.
+    Integer-only (i * h // new_h), so there is no float rounding at exact pixel boundaries.
+    Stored as uint16 when the source fits (half the cache footprint of int32).
+    """
+    dtype = np.uint16 if max(h, w) < 65536 else np.int32
+    row_idx = (np.arange(new_h, dtype=np.int64) * h // new_h).astype(dtype)
+    col_idx = (np.arange(new_w, dtype=np.int64) * w // new_w).astype(dtype)
+    return row_idx, col_idx
+
+def _safe_resize_array_nn(arr, new_w, new_h, row_idx=None, col_idx=None):
     """
     Nearest-neighbor resize for a numpy array frame (H x W x C) to (new_h, new_w).
     Pure numpy implementation (no PIL/Scipy/OpenCV).
+    row_idx/col_idx may be passed in precomputed (see _nn_indices) to skip index setup.
     """
     if arr is None:
         return arr
@@ -30,26 +68,122 @@ def _safe_resize_array_nn(arr, new_w, new_h):
     h, w = arr.shape[:2]
     if h == new_h and w == new_w:
         return arr
-    # compute source indices
-    row_idx = (np.floor(np.linspace(0, h - 1, new_h)).astype(np.int32))
-    col_idx = (np.floor(np.linspace(0, w - 1, new_w)).astype(np.int32))
-    # use advanced indexing to sample the pixels
-    resized = arr[row_idx[:, None], col_idx[None, :]]
-    return resized
+    if new_h % h == 0 and new_w % w == 0:
+        return _upscale_blocks(arr, new_h // h, new_w // w)
+    if row_idx is None or col_idx is None:
+        row_idx, col_idx = _nn_indices(h, w, new_h, new_w)
+    if new_w == w:
+        # Only rows change: plain row copies
+        return arr.take(row_idx, axis=0)
+    return _gather_nn(arr, row_idx, col_idx)
+
+def _upscale_blocks(arr, ry, rx):
+    """
+    Integer-ratio nearest-neighbor upscale: every source pixel becomes an ry x rx block.
+    Broadcasting is free and the reshape does one contiguous copy (same result as the gather).
+    """
+    h, w = arr.shape[:2]
+    tail = arr.shape[2:]
+    blocks = np.broadcast_to(arr[:, None, :, None], (h, ry, w, rx) + tail)
+    return blocks.reshape((h * ry, w * rx) + tail)
+
+def _integer_ratio(idx):
+    """
+    r if idx is exactly the plain nearest-neighbor upscale arange(len(idx)) // r of a
+    len(idx) / r long axis (no crop offset), else None.
+    """
+    n = len(idx)
+    src = int(idx[-1]) + 1
+    if n % src or not np.array_equal(idx, np.arange(n) // (n // src)):
+        return None
+    return n // src
+
+def _gather_nn(arr, row_idx, col_idx):
+    """
+    Return arr[row_idx][:, col_idx] for absolute source indices (no shortcuts).
+    """
+    h, w = arr.shape[:2]
+    # Gather whole pixels from a flattened (h*w, ...) view with one take() call,
+    # which avoids the 2-D broadcast mesh of arr[row_idx[:, None], col_idx[None, :]]
+    tail = arr.shape[2:]
+    flat = arr.reshape((h * w,) + tail)
+    # widen before multiplying: compact (uint16) indices would overflow row * w
+    lin = (row_idx.astype(np.intp)[:, None] * w + col_idx[None, :]).ravel()
+    return flat.take(lin, axis=0).reshape((len(row_idx), len(col_idx)) + tail)
+
+def _color_lut(factor):
+    """
+    uint8 lookup table equivalent to vfx.colorx: min(255, factor * v), truncated.
+    """
+    return np.minimum(255, factor * np.arange(256)).astype(np.uint8)
+
+def _nn_frame_sampler(row_idx, col_idx, color=None):
+    """
+    Return a per-frame function for clip.fl_image that samples frame rows row_idx
+    and columns col_idx (nearest-neighbor). Indices are absolute source coordinates,
+    so a crop offset can be folded into them. If color is given, the vfx.colorx
+    boost by that factor is applied in the same pass.
+    """
+    lut = None if color is None else _color_lut(color)
+    def _boost(arr):
+        if color is None:
+            return arr
+        if arr.dtype == np.uint8:
+            return lut.take(arr)
+        return np.minimum(255, color * arr).astype('uint8')
+    # Integer-ratio upscale of the whole frame: repeat blocks instead of gathering,
+    # boosting the (smaller) source frame first
+    ry, rx = _integer_ratio(row_idx), _integer_ratio(col_idx)
+    upscale_src = None
+    if ry is not None and rx is not None and (ry > 1 or rx > 1):
+        upscale_src = (len(row_idx) // ry, len(col_idx) // rx)
+    def _gather(frame):
+        if frame.shape[:2] == upscale_src:
+            return _upscale_blocks(_boost(frame), ry, rx)
+        return _boost(_gather_nn(frame, row_idx, col_idx))
+    if HAS_NUMBA:
+        new_h, new_w = len(row_idx), len(col_idx)
+        # Two output buffers used alternately, so the frame handed out last stays
+        # intact while the next one is being written.
+        buffers = []
+        turn = [0]
+        def _sample(frame):
+            if (frame.ndim != 3 or (lut is not None and frame.dtype != np.uint8)
+                    or frame.shape[:2] == upscale_src):
+                return _gather(frame)
+            shape = (new_h, new_w, frame.shape[2])
+            if not buffers or buffers[0].shape != shape or buffers[0].dtype != frame.dtype:
+                buffers[:] = [np.empty(shape, dtype=frame.dtype) for _ in range(2)]
+            turn[0] ^= 1
+            if lut is None:
+                return nn_resize(frame, row_idx, col_idx, buffers[turn[0]])
+            return nn_resize_lut(frame, row_idx, col_idx, lut, buffers[turn[0]])
+        return _sample
+    return _gather
+
+# Target size helpers. Sizes are positive, so int(x + 0.5) rounds halves up. This is
+# deliberate and differs from round(), which rounds halves to even (round(2.5) == 2),
+# so a .5 size can come out one pixel larger than the old round() code gave.
+def _target_from_factor(clip_w, clip_h, factor):
+    return max(1, int(clip_w * factor + 0.5)), max(1, int(clip_h * factor + 0.5))
+
+def _target_from_width(clip_w, clip_h, width):
+    new_w = int(width + 0.5)
+    return new_w, max(1, int(clip_h * (new_w / float(clip_w)) + 0.5))
+
+def _target_from_height(clip_w, clip_h, height):
+    new_h = int(height + 0.5)
+    return max(1, int(clip_w * (new_h / float(clip_h)) + 0.5)), new_h
 
 def _compute_target_size(clip_w, clip_h, width=None, height=None, factor=None):
     if factor is not None:
-        return max(1, int(round(clip_w * factor))), max(1, int(round(clip_h * factor)))
+        return _target_from_factor(clip_w, clip_h, factor)
     if width is not None and height is not None:
-        return max(1, int(round(width))), max(1, int(round(height)))
+        return max(1, int(width + 0.5)), max(1, int(height + 0.5))
     if width is not None:
-        new_w = int(round(width))
-        new_h = max(1, int(round(clip_h * (new_w / float(clip_w)))))
-        return new_w, new_h
+        return _target_from_width(clip_w, clip_h, width)
     if height is not None:
-        new_h = int(round(height))
-        new_w = max(1, int(round(clip_w * (new_h / float(clip_h)))))
-        return new_w, new_h
+        return _target_from_height(clip_w, clip_h, height)
     # default: no change
     return clip_w, clip_h
 
@@ -58,12 +192,15 @@ def safe_resize_clip(clip, width=None, height=None, factor=None):
     Resize a clip robustly:
     - If Pillow (or other dependencies) are present moviepy's vfx.resize is used.
     - Else, use a numpy-based nearest-neighbor resize via clip.fl_image.
-    Returns a new clip with the requested size.
+    Returns a new clip with the requested size, or the clip itself when the
+    requested size is within 1/64 (~1.5%) of the current one on both axes.
     """
     new_w, new_h = _compute_target_size(clip.w, clip.h, width, height, factor)
 
-    # If nothing to do, return original clip
-    if new_w == clip.w and new_h == clip.h:
+    # If nothing to do (or the change is within 1/64 per axis, e.g. a ~1300 px source
+    # capped to 1280: not worth a per-frame resample), return original clip.
+    # Relative, so small clips still get resized.
+    if abs(new_w - clip.w) * 64 <= clip.w and abs(new_h - clip.h) * 64 <= clip.h:
         return clip
 
     # If PIL is available, prefer the moviepy/vfx resize path which will use PIL for good quality
@@ -77,13 +214,13 @@ def safe_resize_clip(clip, width=None, height=None, factor=None):
             return clip.fx(vfx.resize, height=new_h)
         return clip.fx(vfx.resize, newsize=(new_w, new_h))
 
-    # Fallback: no PIL/Scipy/OpenCV available. Use fl_image with _safe_resize_array_nn.
-    def _resize_frame(frame):
-        return _safe_resize_array_nn(frame, new_w, new_h)
-    # fl_image will apply the function to each frame (frame is a numpy array)
+    # Fallback: no PIL/Scipy/OpenCV available. Use fl_image with an _nn_frame_sampler.
+    # Source indices depend only on the clip size, so build them once for all frames.
+    row_idx, col_idx = _nn_indices(clip.h, clip.w, new_h, new_w)
+    _resize_frame = _nn_frame_sampler(row_idx, col_idx)
+    # fl_image will apply the function to each frame (frame is a numpy array);
+    # it already keeps duration and fps, only the size metadata needs updating
     resized_clip = clip.fl_image(_resize_frame)
-    # Keep same duration and fps, but update size metadata for moviepy
-    resized_clip = resized_clip.set_duration(clip.duration)
     # moviepy uses clip.w/clip.h from the first frame; set size attributes for safety
     resized_clip.size = (new_w, new_h)
     return resized_clip
@@ -94,29 +231,56 @@ def safe_resize_image_array(arr, new_w, new_h):
     """
     return _safe_resize_array_nn(arr, new_w, new_h)
 
-def safe_load_and_resize_image(image_path, target_h):
+def _bilinear_resize_np(arr, new_w, new_h):
+    """
+    Bilinear resize for a numpy image array (H x W x C or H x W) to (new_h, new_w).
+    Pure numpy; used for still overlays when PIL is missing, where NN looks too blocky.
+    """
+    h, w = arr.shape[:2]
+    if h == new_h and w == new_w:
+        return arr
+    src = arr[..., None] if arr.ndim == 2 else arr
+    src = src.astype(np.float32)
+    # sample at output pixel centers, clamped to the source edges
+    ys = np.clip((np.arange(new_h) + 0.5) * (h / float(new_h)) - 0.5, 0, h - 1)
+    xs = np.clip((np.arange(new_w) + 0.5) * (w / float(new_w)) - 0.5, 0, w - 1)
+    y0 = ys.astype(np.int32)
+    x0 = xs.astype(np.int32)
+    y1 = np.minimum(y0 + 1, h - 1)
+    x1 = np.minimum(x0 + 1, w - 1)
+    wy = (ys - y0).astype(np.float32)[:, None]
+    wx = (xs - x0).astype(np.float32)[None, :]
+    out = (np.einsum('ij,ijc->ijc', (1 - wy) * (1 - wx), src[y0[:, None], x0[None, :]])
+           + np.einsum('ij,ijc->ijc', (1 - wy) * wx, src[y0[:, None], x1[None, :]])
+           + np.einsum('ij,ijc->ijc', wy * (1 - wx), src[y1[:, None], x0[None, :]])
+           + np.einsum('ij,ijc->ijc', wy * wx, src[y1[:, None], x1[None, :]]))
+    if np.issubdtype(arr.dtype, np.integer):
+        info = np.iinfo(arr.dtype)
+        out = np.clip(out + 0.5, info.min, info.max)
+    out = out.astype(arr.dtype)
+    return out[..., 0] if arr.ndim == 2 else out
+
+def safe_load_and_resize_image(image_path, target_h, resample=None):
     """
     Load an image from disk and produce a numpy array resized to target height (preserving aspect).
-    Uses PIL if available (better quality), else uses moviepy.ImageClip to load then numpy resize.
+    Uses PIL if available (better quality; resample defaults to LANCZOS), else uses
+    moviepy.ImageClip to load then a numpy bilinear resize.
     Returns a numpy array (H x W x 4) RGBA.
     """
     if not os.path.exists(image_path):
         raise FileNotFoundError(image_path)
 
     if HAS_PIL:
-        pil_img = PILImage.open(image_path).convert("RGBA")
+        pil_img = PILImage.open(image_path)
+        if pil_img.mode != "RGBA":
+            pil_img = pil_img.convert("RGBA")
         ow, oh = pil_img.size
         if oh == 0:
             raise ValueError("Invalid image height")
         scale = target_h / float(oh)
         new_w = max(1, int(round(ow * scale)))
         new_h = max(1, int(round(oh * scale)))
-        # Use LANCZOS if available
-        try:
-            resample = PILImage.Resampling.LANCZOS
-        except Exception:
-            resample = getattr(PILImage, "LANCZOS", getattr(PILImage, "ANTIALIAS", PILImage.BICUBIC))
-        pil_img = pil_img.resize((new_w, new_h), resample=resample)
+        pil_img = pil_img.resize((new_w, new_h), resample=RESAMPLE_LANCZOS if resample is None else resample)
         arr = np.array(pil_img)
         return arr
     else:
@@ -130,151 +294,223 @@ def safe_load_and_resize_image(image_path, target_h):
         scale = target_h / float(h)
         new_w = max(1, int(round(w * scale)))
         new_h = max(1, int(round(h * scale)))
-        arr_resized = safe_resize_image_array(arr, new_w, new_h)
+        arr_resized = _bilinear_resize_np(arr, new_w, new_h)
         # Ensure result has 3 or 4 channels (ImageClip may produce RGB)
         if arr_resized.ndim == 2:
             arr_resized = np.stack([arr_resized]*3, axis=-1)
         return arr_resized
 
+# Loaded fonts keyed by (font file, size); truetype() re-reads and parses the file each call
+_FONT_CACHE = {}
+
+def _get_font(fontsize, path="arial.ttf"):
+    key = (path, fontsize)
+    font = _FONT_CACHE.get(key)
+    if font is None:
+        try:
+            font = ImageFont.truetype(path, fontsize)
+        except Exception:
+            font = ImageFont.load_default()
+        _FONT_CACHE[key] = font
+    return font
+
+# Rendered Pillow text ImageClips keyed by (txt, fontsize, color, size). The same few
+# words ("MLG", "REKT", ...) are captioned over and over, so each is rasterized once.
+_TEXT_CACHE = {}
+
 def safe_text_clip(txt, fontsize=48, color='white', duration=2, size=(640, 360)):
     """
     Return an ImageClip with text.
-    - If Pillow is available, use it to draw text on a transparent image.
+    - If Pillow is available, use it to draw text on a transparent image (cached per
+      text/font size/color/canvas size).
     - Else try moviepy.TextClip (ImageMagick).
     - Else return a transparent placeholder clip of the requested size and duration.
     """
     if HAS_PIL:
+        size = tuple(size)
+        key = (txt, fontsize, color, size)
+        cached = _TEXT_CACHE.get(key)
+        if cached is not None:
+            return cached.set_duration(duration)
+        font = _get_font(fontsize)
+        if hasattr(font, "getbbox"):
+            # Pillow >= 8; draw.textsize was removed in Pillow 10
+            left, top, right, bottom = font.getbbox(txt)
+        else:
+            left, top = 0, 0
+            right, bottom = font.getsize(txt)
+        w, h = right - left, bottom - top
+        pos = ((size[0] - w) // 2 - left, (size[1] - h) // 2 - top)
+        # Rasterize the glyphs once as a coverage mask; the 2 px black outline is that
+        # mask dilated by a 5x5 max filter, then the colour text is pasted over it
+        mask = PILImage.new("L", size, 0)
+        ImageDraw.Draw(mask).text(pos, txt, font=font, fill=255)
+        outline = mask.filter(ImageFilter.MaxFilter(5))
         img = PILImage.new("RGBA", size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        try:
-            font = ImageFont.truetype("arial.ttf", fontsize)
-        except Exception:
-            font = ImageFont.load_default()
-        w, h = draw.textsize(txt, font=font)
-        pos = ((size[0] - w) // 2, (size[1] - h) // 2)
-        outline_color = "black"
-        for ox, oy in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-            draw.text((pos[0] + ox, pos[1] + oy), txt, font=font, fill=outline_color)
-        draw.text(pos, txt, font=font, fill=color)
-        return ImageClip(np.array(img)).set_duration(duration)
-    else:
+        img.paste((0, 0, 0, 255), mask=outline)
+        img.paste(color, mask=mask)
+        txtclip = ImageClip(np.array(img))
+        _TEXT_CACHE[key] = txtclip
+        return txtclip.set_duration(duration)
+    if _HAS_IMAGEMAGICK:
         try:
             txtclip = TextClip(txt, fontsize=fontsize, color=color, stroke_color='black', stroke_width=2)
-            txtclip = txtclip.set_duration(duration)
-            return txtclip
+            return txtclip.set_duration(duration)
         except Exception:
-            w, h = size
-            arr = np.zeros((h, w, 4), dtype=np.uint8)
-            return ImageClip(arr).set_duration(duration)
+            pass
+    w, h = size
+    arr = np.zeros((h, w, 4), dtype=np.uint8)
+    return ImageClip(arr).set_duration(duration)
 
 def flash(clip, flashes=6, color=(255, 255, 255)):
     w, h = clip.size
     flashes_clips = []
+    # Every flash shows the same frame: build one clip and place shallow copies of it
+    # (set_start returns a copy that shares the frame array)
+    base = ImageClip(_solid_frame(w, h, tuple(color))).set_duration(0.05)
     for i in range(flashes):
         t = i * clip.duration / max(flashes, 1)
-        img = ImageClip(make_solid_image(w, h, color)).set_start(t).set_duration(0.05)
-        flashes_clips.append(img)
+        flashes_clips.append(base.set_start(t))
     return CompositeVideoClip([clip] + flashes_clips).set_duration(clip.duration)
 
 def make_solid_image(w, h, color):
-    arr = np.zeros((h, w, 3), dtype=np.uint8)
-    arr[..., 0] = color[0]
-    arr[..., 1] = color[1]
-    arr[..., 2] = color[2]
+    # Single fill pass; returns a fresh writable array
+    return np.full((h, w, 3), color[:3], dtype=np.uint8)
+
+@lru_cache(maxsize=8)
+def _solid_frame(w, h, color):
+    # Shared solid frames for flash(), so repeated flashes of one size/color reuse one buffer.
+    # Read-only, so a caller writing into it fails loudly instead of recolouring every flash.
+    arr = make_solid_image(w, h, color)
+    arr.setflags(write=False)
     return arr
 
-def quick_cut(clips, target_duration=None):
+def quick_cut(clips, target_duration=None, rng=random):
+    """
+    Cut a short random shot from each clip, until target_duration is exceeded.
+    rng is anything with uniform()/random() (the random module or a numpy Generator).
+    """
     shots = []
+    total_dur = 0.0
     for clip in clips:
         dur = clip.duration
         max_len = min(2.0, dur)
         if max_len <= 0.1:
             continue
-        length = random.uniform(0.2, max_len)
-        start = random.uniform(0, max(0, dur - length))
+        length = rng.uniform(0.2, max_len)
+        start = rng.uniform(0, max(0, dur - length))
         shot = clip.subclip(start, start + length)
-        if random.random() < 0.6:
-            factor = random.uniform(1.3, 2.5)
+        if rng.random() < 0.6:
+            factor = rng.uniform(1.3, 2.5)
             # Use safe_resize_clip for speed changes that imply resizing via speedx (no change needed)
             shot = shot.fx(vfx.speedx, factor)
-        if random.random() < 0.5:
-            shot = shot.fx(vfx.colorx, random.uniform(1.2, 2.2))
-            shot = zoom_effect(shot)
+        if rng.random() < 0.5:
+            # Colour boost and zoom share one per-frame pass
+            shot = zoom_effect(shot, color=rng.uniform(1.2, 2.2), rng=rng)
         shots.append(shot)
-        if target_duration and sum(s.duration for s in shots) > target_duration:
+        total_dur += shot.duration
+        if target_duration and total_dur > target_duration:
             break
     return shots
 
-def zoom_effect(clip, max_zoom=1.5):
+def zoom_effect(clip, max_zoom=1.5, color=None, rng=random):
     """
-    Simple zoom implemented via resizing frames. Uses safe_resize_clip to avoid
-    moviepy's dependency on PIL/Scipy/OpenCV.
-    This implementation applies a small random resize factor for the zoom.
+    Simple zoom: crop a centered window of 1/factor of the frame and scale it back up
+    to the clip size with nearest-neighbor sampling. The crop offset is folded into
+    the sampling indices, so each frame costs one gather and the clip keeps its size.
+    If color is given, the frame is also boosted like vfx.colorx(color) in that pass.
+    No PIL/Scipy/OpenCV needed.
     """
-    factor = random.uniform(1.08, max_zoom)
-    # Use safe resize so it works even without PIL/Scipy/OpenCV
-    return safe_resize_clip(clip, factor=factor)
+    factor = rng.uniform(1.08, max_zoom)
+    w, h = clip.size
+    crop_w = max(1, int(round(w / factor)))
+    crop_h = max(1, int(round(h / factor)))
+    x0 = (w - crop_w) // 2
+    y0 = (h - crop_h) // 2
+    row_idx, col_idx = _nn_indices(crop_h, crop_w, h, w)
+    return clip.fl_image(_nn_frame_sampler(row_idx + y0, col_idx + x0, color=color))
 
-def overlay_image(clip, image_path, pos=('center', 'center'), duration=None, opacity=0.95):
+# Resized overlay ImageClips keyed by (image_path, target_h, opacity); overlays are static
+# images reused by many shots, so each file is decoded, resampled and split into RGB +
+# alpha mask only once. The opacity is baked into the mask, so no per-frame set_opacity
+# multiply is needed. set_duration/set_pos return copies, so sharing is safe.
+_OVERLAY_CACHE = {}
+
+def _cached_overlay_clip(image_path, target_h, opacity=1.0):
+    key = (image_path, target_h, opacity)
+    img_clip = _OVERLAY_CACHE.get(key)
+    if img_clip is None:
+        # Small static overlays: BILINEAR is visually enough and much cheaper than LANCZOS
+        arr = safe_load_and_resize_image(image_path, target_h, resample=RESAMPLE_BILINEAR)
+        if arr.shape[2] == 4:
+            alpha = arr[:, :, 3] / 255.0
+        else:
+            alpha = np.ones(arr.shape[:2])
+        img_clip = ImageClip(np.ascontiguousarray(arr[:, :, :3]))
+        img_clip = img_clip.set_mask(ImageClip(alpha * opacity, ismask=True))
+        _OVERLAY_CACHE[key] = img_clip
+    return img_clip
+
+def overlay_layer(clip, image_path, pos=('center', 'center'), duration=None, opacity=0.95):
     """
-    Overlay an image onto clip.
+    Build the positioned image layer that overlay_image would put on top of clip,
+    without compositing it. Returns None if the image is missing or unusable.
     - If PIL is available, use it to load and resize the overlay.
     - Else load with moviepy.ImageClip then resize using our numpy fallback.
+    The resized overlay is cached per (image_path, target height, opacity).
     """
     if not image_path:
-        return clip
-    if not os.path.exists(image_path):
-        return clip
+        return None
+    # Target height is a fraction of clip height
+    target_h = int(clip.h * 0.35)
+    # Already-cached overlays need no filesystem check
+    if (image_path, target_h, opacity) not in _OVERLAY_CACHE and not os.path.exists(image_path):
+        return None
 
     try:
-        # Target height is a fraction of clip height
-        target_h = int(clip.h * 0.35)
-        if HAS_PIL:
-            pil_img = PILImage.open(image_path).convert("RGBA")
-            ow, oh = pil_img.size
-            if oh == 0:
-                return clip
-            scale = target_h / float(oh)
-            new_w = max(1, int(round(ow * scale)))
-            new_h = max(1, int(round(oh * scale)))
-            try:
-                resample = PILImage.Resampling.LANCZOS
-            except Exception:
-                resample = getattr(PILImage, "LANCZOS", getattr(PILImage, "ANTIALIAS", PILImage.BICUBIC))
-            pil_img = pil_img.resize((new_w, new_h), resample=resample)
-            img_clip = ImageClip(np.array(pil_img)).set_duration(duration or clip.duration).set_opacity(opacity)
-            img_clip = img_clip.set_pos(pos)
-            return CompositeVideoClip([clip, img_clip.set_duration(clip.duration)])
-        else:
-            # Load via ImageClip then get array and resize with numpy fallback
-            img_clip = ImageClip(image_path).set_duration(duration or clip.duration).set_opacity(opacity)
-            arr = img_clip.get_frame(0)  # H x W x C
-            h, w = arr.shape[:2]
-            if h == 0:
-                return clip
-            scale = target_h / float(h)
-            new_w = max(1, int(round(w * scale)))
-            new_h = max(1, int(round(h * scale)))
-            arr_resized = safe_resize_image_array(arr, new_w, new_h)
-            img_clip2 = ImageClip(arr_resized).set_duration(duration or clip.duration).set_opacity(opacity)
-            img_clip2 = img_clip2.set_pos(pos)
-            return CompositeVideoClip([clip, img_clip2.set_duration(clip.duration)])
+        img_clip = _cached_overlay_clip(image_path, target_h, opacity)
+        img_clip = img_clip.set_duration(duration or clip.duration)
+        img_clip = img_clip.set_pos(pos)
+        return img_clip.set_duration(clip.duration)
+    except ValueError:
+        # Zero-height source image
+        return None
     except Exception:
         try:
             img = ImageClip(image_path).set_duration(duration or clip.duration).set_opacity(opacity)
             img = img.resize(height=int(clip.h * 0.35))
             img = img.set_pos(pos)
-            return CompositeVideoClip([clip, img.set_duration(clip.duration)])
+            return img.set_duration(clip.duration)
+        except Exception:
+            return None
+
+def overlay_image(clip, image_path, pos=('center', 'center'), duration=None, opacity=0.95):
+    """
+    Overlay an image onto clip (see overlay_layer).
+    """
+    layer = overlay_layer(clip, image_path, pos=pos, duration=duration, opacity=opacity)
+    if layer is None:
+        return clip
+    return CompositeVideoClip([clip, layer])
+
+def text_layer(clip, text, fontsize=48, duration=1.5, rng=random):
+    """
+    Build the text layer that add_text_overlay would put on top of clip, without compositing it.
+    """
+    txtclip = None
+    if _HAS_IMAGEMAGICK:
+        try:
+            txtclip = TextClip(text, fontsize=fontsize, color='white', stroke_color='black', stroke_width=2)
+            txtclip = txtclip.set_duration(duration)
         except Exception:
-            return clip
+            txtclip = None
+    if txtclip is None:
+        txtclip = safe_text_clip(text, fontsize=fontsize, duration=duration, size=clip.size)
+    txtclip = txtclip.set_pos(("center", "bottom"))
+    return txtclip.set_start(rng.uniform(0, max(0, clip.duration - duration))).set_opacity(0.9)
 
 def add_text_overlay(clip, text, fontsize=48, duration=1.5):
-    try:
-        txtclip = TextClip(text, fontsize=fontsize, color='white', stroke_color='black', stroke_width=2)
-        txtclip = txtclip.set_duration(duration).set_pos(("center", "bottom"))
-    except Exception:
-        txtclip = safe_text_clip(text, fontsize=fontsize, duration=duration, size=clip.size).set_pos(("center", "bottom"))
-    return CompositeVideoClip([clip, txtclip.set_start(random.uniform(0, max(0, clip.duration - duration))).set_opacity(0.9)])
+    return CompositeVideoClip([clip, text_layer(clip, text, fontsize=fontsize, duration=duration)])
 
 def add_airhorn(clip, airhorn_path, when=0.1, vol=1.0):
     if not os.path.exists(airhorn_path):
@@ -285,47 +521,124 @@ def add_airhorn(clip, airhorn_path, when=0.1, vol=1.0):
     except Exception:
         return clip
 
-def make_mlg_clip_sequence(video_paths, assets, target_duration=12, intensity="medium"):
-    loaded = []
-    for p in video_paths:
+def _load_video(path, audio=True):
+    """
+    Open a source video, capped to 1280 px on its longest side. Returns None on failure.
+    audio=False skips the clip's audio reader (one less ffmpeg process per source).
+    """
+    try:
+        v = VideoFileClip(path, audio=audio)
+        if max(v.size) > 1280:
+            # Use safe_resize_clip to reduce resolution without requiring extra deps
+            v = safe_resize_clip(v, width=1280)
+        return v
+    except Exception:
+        return None
+
+def _decode_audio(path, max_duration=None, volume=1.0):
+    """
+    Decode (the first max_duration seconds of) an audio file into an in-memory
+    AudioArrayClip and close the file reader. moviepy copies an AudioFileClip on every
+    set_*/fx call and each copy's __del__ closes the reader they all share, so a
+    long-lived AudioFileClip can lose its reader mid-render; an array clip has none.
+    """
+    src = AudioFileClip(path)
+    try:
+        clip = src
+        if max_duration is not None and max_duration < src.duration:
+            clip = src.set_duration(max_duration)
+        # iter_chunks + vstack of a list: to_soundarray hands np.vstack a generator for
+        # long clips, which numpy >= 1.24 rejects
+        arr = np.vstack(list(clip.iter_chunks(chunksize=50000, fps=src.fps)))
+    finally:
+        src.close()
+    if volume != 1.0:
+        arr = arr * volume
+    return AudioArrayClip(arr, fps=src.fps)
+
+def make_mlg_clip_sequence(video_paths, assets, target_duration=12, intensity="medium", seed=None):
+    """
+    Build the MLG montage clip. All random choices come from one numpy Generator,
+    so passing the same seed reproduces the same montage.
+    """
+    rng = np.random.default_rng(seed)
+    # Check each asset once instead of per shot
+    asset_exists = dict((k, os.path.exists(v)) for k, v in assets.items())
+    # The Mountain Dew track replaces the shots' own audio, so the shots' audio is only
+    # opened if the track is missing or fails to decode. quick_cut stops past
+    # target_duration with shots of at most 2 s, which bounds how much is needed.
+    music = None
+    if asset_exists.get("mtndew", False):
         try:
-            v = VideoFileClip(p)
-            if max(v.size) > 1280:
-                # Use safe_resize_clip to reduce resolution without requiring extra deps
-                v = safe_resize_clip(v, width=1280)
-            loaded.append(v)
+            music = _decode_audio(assets["mtndew"], max_duration=target_duration + 2.0 if target_duration else None,
+                                  volume=0.2)
         except Exception:
-            continue
+            music = None
+    keep_audio = music is None
+    loaded = []
+    if video_paths:
+        # Each VideoFileClip waits on its own ffmpeg probe/reader process, so open them concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(video_paths))) as ex:
+            loaded = [v for v in ex.map(lambda p: _load_video(p, audio=keep_audio), video_paths) if v is not None]
     if not loaded:
         raise RuntimeError("No valid video clips loaded")
 
-    shots = quick_cut(loaded, target_duration=target_duration)
+    shots = quick_cut(loaded, target_duration=target_duration, rng=rng)
     if not shots:
         raise RuntimeError("No shots created for MLG sequence")
 
+    # Decode the airhorn once into memory and close its reader; every shot that fires
+    # it shares the in-memory clip (no ffmpeg process, no re-seeking per use)
+    airhorn_audio = None
+    if asset_exists.get("airhorn", False):
+        try:
+            airhorn_audio = _decode_audio(assets["airhorn"])
+        except Exception:
+            airhorn_audio = None
+
+    # Draw every per-shot decision up front: doritos, lensflare, text, airhorn
+    rolls = rng.random((len(shots), 4))
+    texts = rng.choice(["MLG", "PWNED", "360 NOSCOPE", "REKT"], size=len(shots))
+    fontsizes = rng.choice([42, 54, 68], size=len(shots))
+
     processed = []
     airhorns = []
-    for s in shots:
-        if random.random() < 0.5:
-            s = overlay_image(s, assets.get("doritos", ""), pos=("left", "top"), opacity=0.95)
-        if random.random() < 0.25:
-            s = overlay_image(s, assets.get("lensflare", ""), pos=("center", "center"), opacity=0.6)
-        if random.random() < 0.6:
-            s = add_text_overlay(s, random.choice(["MLG", "PWNED", "360 NOSCOPE", "REKT"]), fontsize=random.choice([42, 54, 68]))
-        if random.random() < 0.4 and os.path.exists(assets.get("airhorn", "")):
-            try:
-                a = AudioFileClip(assets.get("airhorn"))
-                airhorns.append((a, 0.0))
-            except Exception:
-                pass
+    for i, s in enumerate(shots):
+        # Collect every overlay for the shot and composite them in one pass,
+        # instead of nesting one CompositeVideoClip per effect
+        layers = [s]
+        if rolls[i, 0] < 0.5 and asset_exists.get("doritos", False):
+            layers.append(overlay_layer(s, assets["doritos"], pos=("left", "top"), opacity=0.95))
+        if rolls[i, 1] < 0.25 and asset_exists.get("lensflare", False):
+            layers.append(overlay_layer(s, assets["lensflare"], pos=("center", "center"), opacity=0.6))
+        if rolls[i, 2] < 0.6:
+            layers.append(text_layer(s, str(texts[i]), fontsize=int(fontsizes[i]), rng=rng))
+        layers = [l for l in layers if l is not None]
+        if len(layers) > 1:
+            s = CompositeVideoClip(layers)
+        if rolls[i, 3] < 0.4 and airhorn_audio is not None:
+            airhorns.append((len(processed), (airhorn_audio, 0.0)))
         processed.append(s)
 
-    final = concatenate_videoclips(processed, method="compose")
-    if os.path.exists(assets.get("mtndew", "")):
-        try:
-            music = AudioFileClip(assets.get("mtndew")).volumex(0.2)
-            music = music.subclip(0, min(final.duration, music.duration))
-            final = final.set_audio(music)
-        except Exception:
-            pass
+    # "chain" just plays the shots back to back; "compose" is only needed to
+    # letterbox shots of different sizes onto a common canvas
+    first_size = tuple(processed[0].size)
+    if all(tuple(p.size) == first_size for p in processed):
+        final = concatenate_videoclips(processed, method="chain")
+    else:
+        final = concatenate_videoclips(processed, method="compose")
+    # Audio bed: the Mountain Dew track if it decoded, else the shots' own audio
+    bed = final.audio
+    if music is not None:
+        bed = music.set_duration(min(final.duration, music.duration))
+    # Mix collected airhorns on top, each at the start of its shot (+ its offset),
+    # and attach the whole soundtrack with a single set_audio
+    layers = [bed] if bed is not None else []
+    if airhorns:
+        shot_starts = [0.0] + list(accumulate(p.duration for p in processed))
+        layers += [a.set_start(shot_starts[i] + when) for i, (a, when) in airhorns]
+    if len(layers) > 1:
+        final = final.set_audio(CompositeAudioClip(layers).set_duration(final.duration))
+    elif layers and layers[0] is not final.audio:
+        final = final.set_audio(layers[0])
     return final
\ No newline at end of file
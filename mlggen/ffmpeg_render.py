@@ -0,0 +1,327 @@
+# Render an MLG montage with a single ffmpeg -filter_complex command.
+# Shots are cut, sped up, colour-boosted, zoomed, overlaid, captioned and mixed
+# inside ffmpeg, so no frame ever passes through Python. The effect choices mirror
+# effects.make_mlg_clip_sequence (the moviepy backend).
+import os
+import random
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from mlggen.ffmpeg_utils import (
+    ffprobe_binary, system_ffmpeg_binary, ffmpeg_filters, filter_options, probe_video, pick_h264_encoder, encoder_args,
+    HWACCEL_DECODE
+)
+
+TEXTS = ["MLG", "PWNED", "360 NOSCOPE", "REKT"]
+MAX_SIDE = 1280
+TEXT_DURATION = 1.5
+# Filters build_command needs that minimal ffmpeg builds may leave out
+REQUIRED_FILTERS = ("drawtext", "zoompan", "amix")
+# Filter options the airhorn mix relies on (added in ffmpeg 4.4 / 4.2)
+REQUIRED_OPTIONS = (("amix", "normalize"), ("adelay", "all"))
+
+def missing_requirements():
+    """
+    Return what this backend is missing on this machine, as a list of strings
+    (empty if it can run): ffprobe for source metadata, and an ffmpeg next to it
+    that has every filter in REQUIRED_FILTERS and option in REQUIRED_OPTIONS.
+    """
+    if ffprobe_binary() is None:
+        return ["ffprobe"]
+    binary = system_ffmpeg_binary()
+    if binary is None:
+        return ["ffmpeg"]
+    filters = ffmpeg_filters(binary)
+    missing = ["{} filter".format(name) for name in REQUIRED_FILTERS if name not in filters]
+    missing += ["{} {} option".format(name, option) for name, option in REQUIRED_OPTIONS
+                if name in filters and option not in filter_options(binary, name)]
+    return missing
+
+def is_available():
+    """
+    True if this backend can run (see missing_requirements).
+    """
+    return not missing_requirements()
+
+def _plan_shots(infos, target_duration=None, rng=random):
+    """
+    Same random cut/speed/colour/zoom choices as effects.quick_cut, as plain data.
+    rng is anything with uniform()/random()/choice() (the random module or a numpy Generator).
+    """
+    shots = []
+    total_dur = 0.0
+    for info in infos:
+        dur = info["duration"]
+        max_len = min(2.0, dur)
+        if max_len <= 0.1:
+            continue
+        length = rng.uniform(0.2, max_len)
+        start = rng.uniform(0, max(0, dur - length))
+        speed = rng.uniform(1.3, 2.5) if rng.random() < 0.6 else 1.0
+        color = zoom = None
+        if rng.random() < 0.5:
+            color = rng.uniform(1.2, 2.2)
+            zoom = rng.uniform(1.08, 1.5)
+        shot = {"info": info, "start": start, "length": length, "speed": speed,
+                "color": color, "zoom": zoom, "duration": length / speed}
+        shots.append(shot)
+        total_dur += shot["duration"]
+        if target_duration and total_dur > target_duration:
+            break
+    return shots
+
+def _decorate_shots(shots, asset_exists, rng=random):
+    """
+    Roll the per-shot overlays/text/airhorn like effects.make_mlg_clip_sequence.
+    """
+    for shot in shots:
+        shot["doritos"] = rng.random() < 0.5 and asset_exists.get("doritos", False)
+        shot["lensflare"] = rng.random() < 0.25 and asset_exists.get("lensflare", False)
+        shot["text"] = None
+        if rng.random() < 0.6:
+            # str()/int(): a numpy Generator's choice() returns numpy scalars
+            shot["text"] = str(rng.choice(TEXTS))
+            shot["fontsize"] = int(rng.choice([42, 54, 68]))
+            shot["text_start"] = rng.uniform(0, max(0, shot["duration"] - TEXT_DURATION))
+        shot["airhorn"] = rng.random() < 0.4 and asset_exists.get("airhorn", False)
+
+def _output_size(info):
+    """
+    Output frame size: the first clip's size capped to MAX_SIDE, rounded to even numbers.
+    """
+    scale = min(1.0, MAX_SIDE / float(max(info["w"], info["h"])))
+    return max(2, int(info["w"] * scale) // 2 * 2), max(2, int(info["h"] * scale) // 2 * 2)
+
+def _escape_text(text):
+    """
+    Escape a drawtext text value for use inside a single-quoted filter argument.
+    A quote cannot be escaped inside quotes, so it becomes a typographic apostrophe;
+    backslash, ':' and drawtext's '%' expansion are backslash-escaped.
+    """
+    text = text.replace("'", u"\u2019")
+    for ch in ("\\", ":", "%"):
+        text = text.replace(ch, "\\" + ch)
+    return text
+
+def _escape_path(path):
+    """
+    Escape a file path for a single-quoted filter argument (forward slashes, '\\:').
+    """
+    return path.replace("\\", "/").replace(":", "\\:").replace("'", u"\u2019")
+
+# Candidate caption fonts; the first that exists is used, else ffmpeg's fontconfig default
+FONT_CANDIDATES = [
+    os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts", "arial.ttf"),
+    "/Library/Fonts/Arial.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/usr/share/fonts/truetype/msttcorefonts/Arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+]
+
+def _find_font():
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+def _atempo(speed):
+    # atempo accepts 0.5..2.0 per instance, so chain it for larger factors
+    parts = []
+    while speed > 2.0:
+        parts.append("atempo=2.0")
+        speed /= 2.0
+    parts.append("atempo={:.4f}".format(speed))
+    return ",".join(parts)
+
+def build_command(shots, assets, output_path, encoder=("none", "libx264", "veryfast", [])):
+    """
+    Build the ffmpeg argument list rendering `shots` (from _plan_shots/_decorate_shots).
+    encoder is a (hwaccel, codec, preset, params) tuple as returned by pick_h264_encoder.
+    """
+    hwaccel = encoder[0]
+    decode = HWACCEL_DECODE.get(hwaccel)
+    decode_args = ["-hwaccel", decode] if decode else []
+    out_w, out_h = _output_size(shots[0]["info"])
+    fps = shots[0]["info"]["fps"]
+    total = sum(s["duration"] for s in shots)
+    inputs = []
+    graph = []
+
+    # One seeked input per shot: -ss/-t before -i makes ffmpeg skip straight to the cut
+    for i, shot in enumerate(shots):
+        shot["input"] = i
+        inputs += decode_args + ["-ss", "{:.3f}".format(shot["start"]), "-t", "{:.3f}".format(shot["length"]),
+                                 "-i", shot["info"]["path"]]
+    n_inputs = len(shots)
+
+    # Overlay images: one input each, scaled once and split for every shot using it
+    # (asset key, overlay x, overlay y, opacity); same placement as the moviepy backend
+    overlay_specs = [("doritos", "0", "0", 0.95), ("lensflare", "(W-w)/2", "(H-h)/2", 0.6)]
+    overlay_labels = {}
+    for key, x, y, opacity in overlay_specs:
+        users = [s for s in shots if s.get(key)]
+        if not users:
+            continue
+        idx = n_inputs
+        n_inputs += 1
+        inputs += ["-i", assets[key]]
+        labels = ["{}{}".format(key, j) for j in range(len(users))]
+        graph.append("[{}:v]scale=-1:{},format=rgba,colorchannelmixer=aa={},split={}{}".format(
+            idx, int(out_h * 0.35), opacity, len(users), "".join("[{}]".format(l) for l in labels)))
+        for shot, label in zip(users, labels):
+            overlay_labels.setdefault(id(shot), []).append((label, x, y))
+
+    font = _find_font()
+    font_arg = "fontfile='{}':".format(_escape_path(font)) if font else ""
+
+    # Per-shot video chain: speed, colour boost, size normalisation, zoom, overlays, text
+    for i, shot in enumerate(shots):
+        chain = ["setpts=(PTS-STARTPTS)/{:.4f}".format(shot["speed"])]
+        if shot["color"]:
+            k = shot["color"]
+            chain.append("lutrgb=r=val*{0:.3f}:g=val*{0:.3f}:b=val*{0:.3f}".format(k))
+        chain.append("scale={0}:{1}:force_original_aspect_ratio=decrease,"
+                     "pad={0}:{1}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={2:.3f}".format(out_w, out_h, fps))
+        if shot["zoom"]:
+            # Progressive centred zoom from 1x to shot["zoom"] over the shot (d=1: one
+            # output frame per input frame, so the timing is unchanged). With d=1 `zoom`
+            # restarts on every input frame, so step from the previous frame's `pzoom`.
+            nframes = max(1, int(shot["duration"] * fps))
+            rate = (shot["zoom"] - 1.0) / nframes
+            chain.append("zoompan=z='min(pzoom+{:.6f},{:.4f})':d=1:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)'"
+                         ":s={}x{}:fps={:.3f},setsar=1".format(rate, shot["zoom"], out_w, out_h, fps))
+        chain.append("format=yuv420p")
+        label = "s{}".format(i)
+        graph.append("[{}:v]{}[{}]".format(shot["input"], ",".join(chain), label))
+        for j, (ov_label, x, y) in enumerate(overlay_labels.get(id(shot), [])):
+            new_label = "s{}o{}".format(i, j)
+            graph.append("[{}][{}]overlay=x={}:y={}[{}]".format(label, ov_label, x, y, new_label))
+            label = new_label
+        if shot["text"]:
+            # Rasterized and composited inside ffmpeg; the border replaces the PIL outline passes
+            a = shot["text_start"]
+            graph.append(
+                "[{}]drawtext={}text='{}':fontsize={}:fontcolor=white@0.9:borderw=2:bordercolor=black@0.9:"
+                "x=(w-tw)/2:y=h-th-20:enable='between(t,{:.3f},{:.3f})'[s{}t]".format(
+                    label, font_arg, _escape_text(shot["text"]), shot["fontsize"], a, a + TEXT_DURATION, i))
+            label = "s{}t".format(i)
+        shot["label"] = label
+    graph.append("{}concat=n={}:v=1:a=0[vout]".format(
+        "".join("[{}]".format(s["label"]) for s in shots), len(shots)))
+
+    # Audio bed: Mountain Dew music if present, else the shots' own audio, else silence
+    audio = None
+    if os.path.exists(assets.get("mtndew", "")):
+        idx = n_inputs
+        n_inputs += 1
+        inputs += ["-i", assets["mtndew"]]
+        graph.append("[{}:a]volume=0.2,atrim=0:{:.3f},asetpts=PTS-STARTPTS[bed]".format(idx, total))
+        audio = "bed"
+    elif all(s["info"]["has_audio"] for s in shots):
+        for i, shot in enumerate(shots):
+            graph.append("[{}:a]asetpts=PTS-STARTPTS,{}[a{}]".format(shot["input"], _atempo(shot["speed"]), i))
+        graph.append("{}concat=n={}:v=0:a=1[bed]".format(
+            "".join("[a{}]".format(i) for i in range(len(shots))), len(shots)))
+        audio = "bed"
+
+    # Airhorns fire at the start of their shot, mixed on top of the bed
+    horn_starts = []
+    t = 0.0
+    for shot in shots:
+        if shot["airhorn"]:
+            horn_starts.append(t)
+        t += shot["duration"]
+    if horn_starts:
+        if audio is None:
+            graph.append("anullsrc=r=44100:cl=stereo,atrim=0:{:.3f}[bed]".format(total))
+            audio = "bed"
+        idx = n_inputs
+        n_inputs += 1
+        inputs += ["-i", assets["airhorn"]]
+        horn_labels = ["h{}".format(j) for j in range(len(horn_starts))]
+        graph.append("[{}:a]asplit={}{}".format(idx, len(horn_labels), "".join("[{}]".format(l) for l in horn_labels)))
+        delayed = []
+        for label, start in zip(horn_labels, horn_starts):
+            ms = int(start * 1000)
+            # all=1 delays every channel (a '|' list only covers the channels it names)
+            graph.append("[{0}]adelay={1}:all=1[{0}d]".format(label, ms))
+            delayed.append("[{}d]".format(label))
+        # normalize=0: plain sum, so the bed keeps its level. With normalisation amix
+        # divides by the inputs still active, which changes as each horn ends.
+        graph.append("[{}]{}amix=inputs={}:duration=first:dropout_transition=0:normalize=0[aout]".format(
+            audio, "".join(delayed), len(delayed) + 1))
+        audio = "aout"
+
+    # -progress writes key=value status lines to stdout for render_mlg_sequence to parse
+    cmd = [system_ffmpeg_binary() or "ffmpeg", "-y", "-v", "error", "-nostats", "-progress", "pipe:1"] + inputs
+    cmd += ["-filter_complex", ";".join(graph), "-map", "[vout]"]
+    if audio:
+        cmd += ["-map", "[{}]".format(audio), "-c:a", "aac"]
+    codec_args = encoder_args(encoder)
+    cmd += codec_args
+    if "-pix_fmt" not in codec_args:
+        cmd += ["-pix_fmt", "yuv420p"]
+    # moov atom up front so the mp4 plays/streams before it is fully downloaded
+    cmd += ["-movflags", "+faststart", output_path]
+    return cmd
+
+def _run_with_progress(cmd, total, progress=None):
+    """
+    Run an ffmpeg command built with -progress pipe:1, calling progress(fraction)
+    as encoding advances. stderr is merged into the same pipe (no second reader,
+    no deadlock); lines that are not progress keys are kept for the error message.
+    Returns (returncode, last error line).
+    """
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    last_error = ""
+    for raw in proc.stdout:
+        line = raw.decode("utf-8", "replace").strip()
+        key, sep, value = line.partition("=")
+        if not sep or " " in key:
+            if line:
+                last_error = line
+            continue
+        # out_time_ms is in microseconds despite its name (newer builds also send out_time_us).
+        # Before the first frame is muxed ffmpeg reports N/A or a huge negative value.
+        if key in ("out_time_us", "out_time_ms") and progress is not None and total > 0:
+            try:
+                elapsed = int(value)
+            except ValueError:
+                continue
+            if elapsed >= 0:
+                progress(min(1.0, elapsed / 1e6 / total))
+        elif key == "progress" and value == "end" and progress is not None:
+            progress(1.0)
+    return proc.wait(), last_error
+
+def render_mlg_sequence(video_paths, assets, output_path, target_duration=12, intensity="medium", hwaccel="auto",
+                        progress=None, seed=None):
+    """
+    Render an MLG montage of video_paths straight to output_path with ffmpeg.
+    hwaccel selects the encoder as in ffmpeg_utils.pick_h264_encoder.
+    progress, if given, is called with the fraction done (0..1) while encoding.
+    All random choices come from one numpy Generator, so the same seed (and inputs)
+    reproduces the same montage.
+    Raises RuntimeError if the backend is unavailable (see missing_requirements),
+    nothing could be loaded or ffmpeg fails.
+    """
+    missing = missing_requirements()
+    if missing:
+        raise RuntimeError("ffmpeg backend unavailable, missing: {}".format(", ".join(missing)))
+    infos = []
+    if video_paths:
+        # One ffprobe process per source; run them concurrently like the moviepy loader
+        with ThreadPoolExecutor(max_workers=min(8, len(video_paths))) as ex:
+            infos = [info for info in ex.map(probe_video, video_paths) if info is not None]
+    if not infos:
+        raise RuntimeError("No valid video clips loaded")
+    rng = np.random.default_rng(seed)
+    shots = _plan_shots(infos, target_duration=target_duration, rng=rng)
+    if not shots:
+        raise RuntimeError("No shots created for MLG sequence")
+    asset_exists = dict((k, os.path.exists(v)) for k, v in assets.items())
+    _decorate_shots(shots, asset_exists, rng=rng)
+    cmd = build_command(shots, assets, output_path, encoder=pick_h264_encoder(hwaccel, binary=system_ffmpeg_binary()))
+    returncode, last_error = _run_with_progress(cmd, sum(s["duration"] for s in shots), progress)
+    if returncode != 0:
+        raise RuntimeError("ffmpeg failed: {}".format(last_error or returncode))
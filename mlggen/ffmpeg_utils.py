@@ -0,0 +1,244 @@
+# Helpers for calling the ffmpeg/ffprobe command line tools directly,
+# for the cases where going through moviepy would decode/re-encode needlessly.
+import json
+import os
+import shutil
+import subprocess
+
+def ffmpeg_binary():
+    """
+    Return the ffmpeg executable moviepy is configured with (falls back to PATH).
+    """
+    try:
+        from moviepy.config import get_setting
+        return get_setting("FFMPEG_BINARY")
+    except Exception:
+        return shutil.which("ffmpeg") or "ffmpeg"
+
+def ffprobe_binary():
+    """
+    Return the ffprobe executable on PATH, or None if it is not installed.
+    (imageio-ffmpeg only ships ffmpeg, so ffprobe is optional.)
+    """
+    return shutil.which("ffprobe")
+
+def system_ffmpeg_binary():
+    """
+    Return the ffmpeg installed alongside ffprobe (else the one on PATH), or None.
+    moviepy's default ffmpeg is imageio-ffmpeg's minimal build, which lacks filters
+    such as drawtext, so commands that need a full build use this one instead.
+    """
+    ffprobe = ffprobe_binary()
+    if ffprobe:
+        folder = os.path.dirname(os.path.realpath(ffprobe))
+        name = "ffmpeg.exe" if ffprobe.lower().endswith(".exe") else "ffmpeg"
+        sibling = os.path.join(folder, name)
+        if os.path.isfile(sibling) and os.access(sibling, os.X_OK):
+            return sibling
+    return shutil.which("ffmpeg")
+
+_FILTER_LISTS = {}
+
+def ffmpeg_filters(binary):
+    """
+    Names of the filters `binary -filters` lists, fetched once per binary.
+    """
+    names = _FILTER_LISTS.get(binary)
+    if names is None:
+        names = set()
+        try:
+            out = subprocess.check_output([binary, "-hide_banner", "-filters"], stderr=subprocess.DEVNULL)
+            for line in out.decode("utf-8", "replace").splitlines():
+                parts = line.split()
+                # "<flags> <name> <in->out> <description>"
+                if len(parts) >= 3 and "->" in parts[2]:
+                    names.add(parts[1])
+        except (OSError, subprocess.CalledProcessError):
+            pass
+        _FILTER_LISTS[binary] = names
+    return names
+
+_FILTER_OPTIONS = {}
+
+def filter_options(binary, name):
+    """
+    Names of the options `binary -h filter=<name>` lists, fetched once per binary
+    and filter (empty if the filter is unknown).
+    """
+    key = (binary, name)
+    options = _FILTER_OPTIONS.get(key)
+    if options is None:
+        options = set()
+        try:
+            out = subprocess.check_output([binary, "-hide_banner", "-h", "filter=" + name],
+                                          stderr=subprocess.DEVNULL)
+            in_options = False
+            for line in out.decode("utf-8", "replace").splitlines():
+                if line.endswith("AVOptions:"):
+                    in_options = True
+                    continue
+                parts = line.split()
+                # "   <option> <<type>> <flags> <description>"; enum values have no <type>
+                if in_options and len(parts) >= 2 and parts[1].startswith("<"):
+                    options.add(parts[0])
+        except (OSError, subprocess.CalledProcessError):
+            pass
+        _FILTER_OPTIONS[key] = options
+    return options
+
+def _run_ffprobe(path, args):
+    """
+    Run ffprobe with JSON output and return the parsed dict, or None.
+    """
+    ffprobe = ffprobe_binary()
+    if ffprobe is None:
+        return None
+    cmd = [ffprobe, "-v", "error", "-print_format", "json"] + list(args) + [path]
+    try:
+        out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL)
+        return json.loads(out.decode("utf-8", "replace"))
+    except Exception:
+        return None
+
+def probe_streams(path):
+    """
+    Return the list of stream dicts reported by ffprobe for path,
+    or None if ffprobe is unavailable or fails.
+    """
+    info = _run_ffprobe(path, ["-show_streams"])
+    return None if info is None else info.get("streams", [])
+
+def probe_video(path):
+    """
+    Read a video's metadata with ffprobe, without opening a decoder.
+    Returns {"path", "w", "h", "duration", "fps", "has_audio"} or None.
+    Duration falls back to the container's when the stream has none (e.g. mkv/webm).
+    """
+    info = _run_ffprobe(path, ["-show_streams", "-show_format"])
+    if not info:
+        return None
+    streams = info.get("streams", [])
+    video = [st for st in streams if st.get("codec_type") == "video"]
+    if not video:
+        return None
+    v = video[0]
+    try:
+        duration = float(v.get("duration") or info.get("format", {}).get("duration") or 0)
+        num, _, den = (v.get("r_frame_rate") or "30/1").partition("/")
+        num, den = float(num), float(den or 1)
+        # "0/0" (unknown rate, e.g. some VFR or still-image streams) falls back to 30 fps
+        fps = num / den if num > 0 and den > 0 else 30.0
+        w, h = int(v["width"]), int(v["height"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if duration <= 0:
+        return None
+    return {
+        "path": path,
+        "w": w,
+        "h": h,
+        "duration": duration,
+        "fps": fps,
+        "has_audio": any(st.get("codec_type") == "audio" for st in streams),
+    }
+
+# H.264 encoders by --hwaccel name: (codec, preset, other output options) for final
+# renders. The preset is kept apart so moviepy callers can hand it to write_videofile's
+# preset= (which always emits -preset) instead of duplicating it in ffmpeg_params.
+# Hardware encoders get an explicit yuv420p (moviepy only adds it for libx264).
+H264_ENCODERS = {
+    "nvenc": ("h264_nvenc", "p4", ["-tune", "hq", "-rc", "vbr", "-cq", "23", "-pix_fmt", "yuv420p"]),
+    "vt": ("h264_videotoolbox", None, ["-b:v", "6M", "-pix_fmt", "yuv420p"]),
+    "qsv": ("h264_qsv", "veryfast", ["-pix_fmt", "yuv420p"]),
+    "none": ("libx264", "veryfast", []),
+}
+# Fastest presets, for intermediate re-encodes such as concat_files where encode speed
+# matters more than size/quality (None: the encoder has no -preset option)
+FAST_H264_ENCODERS = {
+    "nvenc": ("h264_nvenc", "p1", ["-pix_fmt", "yuv420p"]),
+    "vt": ("h264_videotoolbox", None, ["-pix_fmt", "yuv420p"]),
+    "qsv": ("h264_qsv", "veryfast", ["-pix_fmt", "yuv420p"]),
+    "none": ("libx264", "ultrafast", []),
+}
+# Order tried by hwaccel="auto"
+HWACCEL_ORDER = ["nvenc", "vt", "qsv"]
+# Decoder-side flag for ffmpeg inputs; ffmpeg falls back to software decode on failure
+HWACCEL_DECODE = {"nvenc": "cuda", "vt": "videotoolbox"}
+
+_ENCODER_LISTS = {}
+_ENCODER_CACHE = {}
+
+def _listed_encoders(binary):
+    """
+    Output of `binary -encoders`, fetched once per binary.
+    """
+    listed = _ENCODER_LISTS.get(binary)
+    if listed is None:
+        try:
+            out = subprocess.check_output([binary, "-hide_banner", "-encoders"], stderr=subprocess.DEVNULL)
+            listed = out.decode("utf-8", "replace")
+        except Exception:
+            listed = ""
+        _ENCODER_LISTS[binary] = listed
+    return listed
+
+def encoder_works(name, params=(), binary=None):
+    """
+    Return True if ffmpeg can actually encode with `name` (and params) on this machine.
+    A build listing h264_nvenc under -encoders may still lack the GPU/driver, so
+    listed encoders get a tiny null encode, once per encoder; the answer is cached.
+    binary is the ffmpeg to test (default: moviepy's, see ffmpeg_binary).
+    """
+    binary = binary or ffmpeg_binary()
+    key = (binary, name)
+    ok = _ENCODER_CACHE.get(key)
+    if ok is None:
+        ok = False
+        if " {} ".format(name) in _listed_encoders(binary):
+            cmd = [binary, "-v", "error", "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+                   "-c:v", name] + list(params) + ["-f", "null", "-"]
+            try:
+                ok = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+            except OSError:
+                ok = False
+        _ENCODER_CACHE[key] = ok
+    return ok
+
+def _output_args(preset, params):
+    return (["-preset", preset] if preset else []) + list(params)
+
+def pick_h264_encoder(hwaccel="auto", binary=None, fast=False):
+    """
+    Return (hwaccel, codec, preset, ffmpeg_params) for H.264 output; preset is None
+    for encoders without one and is not repeated in ffmpeg_params.
+    hwaccel is "auto" (first working of NVENC, VideoToolbox, QSV), "none",
+    or one of "nvenc", "vt", "qsv"; a hardware encoder that does not work
+    falls back to libx264. binary is the ffmpeg that will do the encoding
+    (default: moviepy's). fast=True picks FAST_H264_ENCODERS' presets.
+    """
+    table = FAST_H264_ENCODERS if fast else H264_ENCODERS
+    candidates = HWACCEL_ORDER if hwaccel == "auto" else [hwaccel]
+    for name in candidates:
+        if name in table and name != "none":
+            codec, preset, params = table[name]
+            if encoder_works(codec, _output_args(preset, params), binary=binary):
+                return name, codec, preset, list(params)
+    codec, preset, params = table["none"]
+    return "none", codec, preset, list(params)
+
+def encoder_args(encoder):
+    """
+    ffmpeg output options (-c:v, -preset, params) for a pick_h264_encoder result.
+    """
+    _, codec, preset, params = encoder
+    return ["-c:v", codec] + _output_args(preset, params)
+
+def write_videofile_kwargs(encoder):
+    """
+    moviepy write_videofile keyword arguments for a pick_h264_encoder result.
+    """
+    _, codec, preset, params = encoder
+    kwargs = {"codec": codec, "ffmpeg_params": list(params)}
+    if preset:
+        kwargs["preset"] = preset
+    return kwargs
@@ -1,9 +1,12 @@
-import threading
+import multiprocessing as mp
+from queue import Empty
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
 from mlggen.assets import resolve_assets
 from mlggen.effects import make_mlg_clip_sequence
+from mlggen import ffmpeg_render
+from mlggen.ffmpeg_utils import pick_h264_encoder, write_videofile_kwargs
 from moviepy.editor import CompositeVideoClip
 
 DEFAULT_OUTPUT = "mlg_output.mp4"
@@ -16,6 +19,7 @@ class MLGGenGUI:
         self.assets = resolve_assets()
         self.intensity = tk.StringVar(value="medium")
         self.randomize = tk.BooleanVar(value=True)
+        self.seed = tk.StringVar(value="")
         self.output_path = tk.StringVar(value=os.path.abspath(DEFAULT_OUTPUT))
 
         frm = ttk.Frame(root, padding=10)
@@ -31,6 +35,8 @@ class MLGGenGUI:
         ttk.Checkbutton(frm, text="Randomize effects", variable=self.randomize).grid(row=3, column=0, sticky="w")
         ttk.Label(frm, text="Intensity:").grid(row=3, column=1, sticky="e")
         ttk.OptionMenu(frm, self.intensity, "medium", "low", "medium", "high").grid(row=3, column=2, sticky="w")
+        ttk.Label(frm, text="Seed (blank = random):").grid(row=6, column=1, sticky="e")
+        ttk.Entry(frm, textvariable=self.seed, width=10).grid(row=6, column=2, sticky="w")
         ttk.Label(frm, text="Output:").grid(row=4, column=0, sticky="w")
         ttk.Entry(frm, textvariable=self.output_path, width=55).grid(row=4, column=1, columnspan=2, sticky="w")
         ttk.Button(frm, text="Browse...", command=self.browse_output).grid(row=4, column=3, sticky="w")
@@ -59,31 +65,89 @@ class MLGGenGUI:
             return
         out = self.output_path.get()
         intensity = self.intensity.get()
+        seed_text = self.seed.get().strip()
+        try:
+            seed = int(seed_text) if seed_text else None
+        except ValueError:
+            messagebox.showwarning("Bad seed", "Seed must be a whole number (or blank)")
+            return
         self.progress.config(text="Starting render...")
-        thread = threading.Thread(target=self._render_thread, args=(list(self.video_paths), out, intensity))
-        thread.daemon = True
-        thread.start()
+        # Render in a separate process: no GIL contention with the Tk loop, and a
+        # crash in the renderer can't take the GUI down. Progress comes back on a queue.
+        # Always spawn: forking a process that runs Tk and numba's worker threads
+        # is unsafe (on Linux the GUI then hangs when it exits).
+        ctx = mp.get_context("spawn")
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_render_worker, args=(list(self.video_paths), out, intensity, self.assets, queue, seed))
+        proc.daemon = True
+        proc.start()
+        self.root.after(100, self._drain_queue, proc, queue)
 
-    def _render_thread(self, paths, out, intensity):
-        try:
-            # Build assets dict (could add GUI to change assets)
-            assets = self.assets
-            self._update_progress("Loading and applying MLG effects...")
-            clip = make_mlg_clip_sequence(paths, assets, target_duration=12, intensity=intensity)
-            self._update_progress("Writing output (this may take a while)...")
+    def _handle_messages(self, queue, timeout=None):
+        """
+        Apply every queued worker message; returns True once "done" or "error" arrived.
+        With a timeout, waits up to that long for the first message.
+        """
+        finished = False
+        while not finished:
+            try:
+                if timeout is None:
+                    kind, text = queue.get_nowait()
+                else:
+                    kind, text = queue.get(timeout=timeout)
+                    timeout = None
+            except Empty:
+                break
+            if kind == "progress":
+                self.progress.config(text=text)
+            elif kind == "done":
+                finished = True
+                self.progress.config(text="Done! Saved to: {}".format(text))
+                messagebox.showinfo("Done", "MLG video saved to:\n{}".format(text))
+            elif kind == "error":
+                finished = True
+                self.progress.config(text="Error: {}".format(text))
+                messagebox.showerror("Error", text)
+        return finished
+
+    def _drain_queue(self, proc, queue):
+        if self._handle_messages(queue):
+            proc.join()
+            return
+        if proc.is_alive():
+            self.root.after(100, self._drain_queue, proc, queue)
+            return
+        # The worker may have queued its last messages and exited after the drain
+        # above; read what it left before deciding it died without reporting
+        if self._handle_messages(queue, timeout=1.0):
+            proc.join()
+            return
+        self.progress.config(text="Error: renderer exited unexpectedly (code {})".format(proc.exitcode))
+
+def _render_worker(paths, out, intensity, assets, queue, seed=None):
+    """
+    Render in a child process, reporting ("progress"|"done"|"error", text) on queue.
+    seed is passed to the renderer (None: a different montage every time).
+    Module-level so it can be pickled for the spawn start method (Windows).
+    """
+    try:
+        if ffmpeg_render.is_available():
+            # Single ffmpeg process does cutting, effects and encoding
+            queue.put(("progress", "Rendering with ffmpeg (this may take a while)..."))
+            def report(fraction):
+                queue.put(("progress", "Rendering with ffmpeg... {:.0f}%".format(fraction * 100)))
+            ffmpeg_render.render_mlg_sequence(paths, assets, out, target_duration=12, intensity=intensity, progress=report,
+                                              seed=seed)
+        else:
+            queue.put(("progress", "Loading and applying MLG effects..."))
+            clip = make_mlg_clip_sequence(paths, assets, target_duration=12, intensity=intensity, seed=seed)
+            queue.put(("progress", "Writing output (this may take a while)..."))
             # Write file via moviepy
-            clip.write_videofile(out, codec="libx264", audio_codec="aac", threads=2)
+            clip.write_videofile(out, audio_codec="aac", threads=2, **write_videofile_kwargs(pick_h264_encoder()))
             clip.close()
-            self._update_progress("Done! Saved to: {}".format(out))
-            messagebox.showinfo("Done", "MLG video saved to:\n{}".format(out))
-        except Exception as e:
-            self._update_progress("Error: {}".format(e))
-            messagebox.showerror("Error", str(e))
-
-    def _update_progress(self, text):
-        def cb():
-            self.progress.config(text=text)
-        self.root.after(1, cb)
+        queue.put(("done", out))
+    except Exception as e:
+        queue.put(("error", str(e)))
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,61 @@
+# Optional Numba-compiled per-frame kernels. numba is not a hard requirement:
+# if it cannot be imported HAS_NUMBA is False and callers use their numpy paths.
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except Exception:
+    njit = None
+    prange = range
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def nn_resize(arr, row_idx, col_idx, out):
+        # Nearest-neighbor gather, one output row per thread; arr and out are (H x W x C)
+        for y in prange(out.shape[0]):
+            src_row = arr[row_idx[y]]
+            for x in range(out.shape[1]):
+                sx = col_idx[x]
+                for c in range(out.shape[2]):
+                    out[y, x, c] = src_row[sx, c]
+        return out
+
+    @njit(parallel=True, cache=True, fastmath=True)
+    def nn_resize_lut(arr, row_idx, col_idx, lut, out):
+        # Same gather with a per-value lookup table (e.g. colour boost) applied on the way
+        for y in prange(out.shape[0]):
+            src_row = arr[row_idx[y]]
+            for x in range(out.shape[1]):
+                sx = col_idx[x]
+                for c in range(out.shape[2]):
+                    out[y, x, c] = lut[src_row[sx, c]]
+        return out
+
+    def _warm_up():
+        """
+        Compile (or load from the on-disk cache) the signatures used for video frames,
+        so the first rendered frame doesn't stall on JIT compilation. Numba types
+        read-only arrays separately, and moviepy's decoded frames are read-only
+        (np.frombuffer), so both variants are compiled for each index dtype.
+        """
+        writable = np.zeros((2, 2, 3), dtype=np.uint8)
+        readonly = writable.copy()
+        readonly.setflags(write=False)
+        out = np.empty((2, 2, 3), dtype=np.uint8)
+        lut = np.arange(256).astype(np.uint8)
+        for frame in (writable, readonly):
+            for dtype in (np.uint16, np.int32):
+                idx = np.zeros(2, dtype=dtype)
+                nn_resize(frame, idx, idx, out)
+                nn_resize_lut(frame, idx, idx, lut, out)
+
+    try:
+        _warm_up()
+    except Exception:
+        # A failed compile must not break importing; fall back to numpy
+        HAS_NUMBA = False
+else:
+    nn_resize = None
+    nn_resize_lut = None
@@ -9,11 +9,23 @@ def run_gui():
 
 def run_cli(args):
     from mlggen.assets import resolve_assets
-    from mlggen.effects import make_mlg_clip_sequence
+    from mlggen import ffmpeg_render
     assets = resolve_assets()
-    clip = make_mlg_clip_sequence(args.inputs, assets, target_duration=args.duration, intensity=args.intensity)
-    print("Writing to", args.output)
-    clip.write_videofile(args.output, codec="libx264", audio_codec="aac")
+    if args.backend == "ffmpeg" or (args.backend == "auto" and ffmpeg_render.is_available()):
+        # Whole montage rendered by one ffmpeg process, no frames through Python
+        print("Rendering with ffmpeg to", args.output)
+        def report(fraction):
+            sys.stdout.write("\r{:5.1f}%".format(fraction * 100))
+            sys.stdout.flush()
+        ffmpeg_render.render_mlg_sequence(args.inputs, assets, args.output, target_duration=args.duration, intensity=args.intensity, hwaccel=args.hwaccel, progress=report, seed=args.seed)
+        print()
+        return
+    from mlggen.effects import make_mlg_clip_sequence
+    from mlggen.ffmpeg_utils import pick_h264_encoder, write_videofile_kwargs
+    clip = make_mlg_clip_sequence(args.inputs, assets, target_duration=args.duration, intensity=args.intensity, seed=args.seed)
+    write_kwargs = write_videofile_kwargs(pick_h264_encoder(args.hwaccel))
+    print("Writing to", args.output, "with", write_kwargs["codec"])
+    clip.write_videofile(args.output, audio_codec="aac", **write_kwargs)
 
 def parse():
     parser = argparse.ArgumentParser(description="MLGGen runner")
@@ -22,6 +34,9 @@ def parse():
     parser.add_argument("--output", default="mlg_cli_output.mp4", help="Output file")
     parser.add_argument("--duration", type=float, default=12.0, help="Target duration (seconds) for CLI MLG montage")
     parser.add_argument("--intensity", choices=["low", "medium", "high"], default="medium", help="Effect intensity")
+    parser.add_argument("--hwaccel", choices=["auto", "none", "nvenc", "qsv", "vt"], default="auto", help="H.264 encoder: hardware (NVENC/QSV/VideoToolbox) if available, or none for libx264")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed; the same seed and inputs give the same montage")
+    parser.add_argument("--backend", choices=["auto", "ffmpeg", "moviepy"], default="auto", help="Renderer (auto: ffmpeg if ffprobe and an ffmpeg 4.4+ with drawtext, zoompan and amix are installed, else moviepy)")
     return parser.parse_args()
 
 def main():
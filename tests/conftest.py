@@ -0,0 +1,38 @@
+import subprocess
+
+import pytest
+
+from mlggen.ffmpeg_utils import ffmpeg_binary
+
+
+def _ffmpeg(*args):
+    subprocess.run([ffmpeg_binary(), "-v", "error", "-y"] + list(args), check=True)
+
+
+@pytest.fixture(scope="session")
+def media(tmp_path_factory):
+    """
+    Small synthetic sources and assets, generated with ffmpeg's lavfi test sources.
+    """
+    root = tmp_path_factory.mktemp("media")
+    paths = {}
+    for name, src, freq in (("a", "testsrc", 440), ("b", "testsrc2", 660)):
+        path = str(root / "{}.mp4".format(name))
+        _ffmpeg("-f", "lavfi", "-i", "{}=s=320x240:r=24:d=3".format(src),
+                "-f", "lavfi", "-i", "sine=f={}:d=3".format(freq),
+                "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", path)
+        paths[name] = path
+    for name, seconds in (("mtndew", 20), ("airhorn", 0.5)):
+        path = str(root / "{}.mp3".format(name))
+        _ffmpeg("-f", "lavfi", "-i", "sine=f=1000:d={}".format(seconds), "-ac", "2", path)
+        paths[name] = path
+    for name in ("doritos", "lensflare"):
+        path = str(root / "{}.png".format(name))
+        _ffmpeg("-f", "lavfi", "-i", "color=c=orange:s=64x64", "-frames:v", "1", path)
+        paths[name] = path
+    return paths
+
+
+@pytest.fixture
+def assets(media):
+    return dict((k, media[k]) for k in ("airhorn", "mtndew", "doritos", "lensflare"))
@@ -0,0 +1,39 @@
+import subprocess
+
+import pytest
+
+pytest.importorskip("moviepy")
+
+from mlggen import concat
+from mlggen.ffmpeg_utils import ffmpeg_binary, ffprobe_binary
+
+
+def _encode(path, vf):
+    subprocess.run([ffmpeg_binary(), "-v", "error", "-y", "-f", "lavfi", "-i", "testsrc=s=160x120:r=24:d=1",
+                    "-vf", vf, "-c:v", "libx264", "-pix_fmt", "yuv420p", path], check=True)
+
+
+@pytest.mark.skipif(ffprobe_binary() is None, reason="ffprobe not installed")
+def test_signature_tells_apart_different_sar(tmp_path):
+    square, wide = str(tmp_path / "square.mp4"), str(tmp_path / "wide.mp4")
+    _encode(square, "setsar=1")
+    _encode(wide, "setsar=2")
+    assert concat._stream_signature(square) != concat._stream_signature(wide)
+
+
+def test_failed_stream_copy_reports_ffmpeg_error(tmp_path):
+    ok, err = concat._concat_stream_copy([str(tmp_path / "missing.mp4")], str(tmp_path / "out.mp4"))
+    assert not ok
+    assert err
+
+
+def test_reencode_uses_the_fast_preset_once(monkeypatch, media, tmp_path):
+    from moviepy.video.VideoClip import VideoClip
+    monkeypatch.setattr(concat, "pick_h264_encoder", lambda fast=False: ("none", "libx264", "ultrafast" if fast else "veryfast", []))
+    calls = []
+    monkeypatch.setattr(VideoClip, "write_videofile", lambda self, path, **kw: calls.append(kw))
+    concat.concat_files([media["a"], media["b"]], str(tmp_path / "out.mp4"), copy_if_possible=False)
+    kwargs = calls[0]
+    assert kwargs["codec"] == "libx264"
+    assert kwargs["preset"] == "ultrafast"
+    assert "-preset" not in kwargs["ffmpeg_params"]
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("moviepy")
+
+from moviepy.audio.AudioClip import AudioArrayClip, CompositeAudioClip
+
+from mlggen.effects import make_mlg_clip_sequence
+
+
+def _montage_with_airhorn(videos, assets):
+    # Shot decisions are random; find a seed whose montage fires at least one airhorn
+    for seed in range(50):
+        final = make_mlg_clip_sequence(videos, assets, target_duration=20, seed=seed)
+        if isinstance(final.audio, CompositeAudioClip) and len(final.audio.clips) > 1:
+            return final
+    pytest.fail("no seed fired an airhorn")
+
+
+def test_render_with_music_and_airhorn(media, assets, tmp_path):
+    final = _montage_with_airhorn([media["a"], media["b"]] * 3, assets)
+    out = str(tmp_path / "out.mp4")
+    final.write_videofile(out, fps=12, temp_audiofile=str(tmp_path / "out.mp3"), logger=None)
+    # The bed is the decoded music track, audible over the whole montage
+    assert isinstance(final.audio.clips[0], AudioArrayClip)
+    tt = np.linspace(0, final.duration - 0.1, 50)
+    assert abs(final.audio.clips[0].get_frame(tt)).max() > 0
+
+
+def test_seed_reproduces_the_montage(media, assets):
+    videos = [media["a"], media["b"]] * 3
+    first, second, other = (make_mlg_clip_sequence(videos, assets, target_duration=20, seed=s) for s in (3, 3, 4))
+    assert first.duration == second.duration
+    assert np.array_equal(first.get_frame(0.4), second.get_frame(0.4))
+    assert first.duration != other.duration
+
+
+@pytest.mark.parametrize("color", [None, 1.5])
+def test_integer_upscale_repeats_blocks(monkeypatch, color):
+    from mlggen import effects
+    frame = np.random.default_rng(0).integers(0, 256, (6, 8, 3)).astype(np.uint8)
+    row_idx, col_idx = effects._nn_indices(6, 8, 12, 24)
+    expected = effects._gather_nn(frame, row_idx, col_idx)
+    if color is not None:
+        expected = effects._color_lut(color).take(expected)
+    sampler = effects._nn_frame_sampler(row_idx, col_idx, color=color)
+
+    def no_gather(*args):
+        raise AssertionError("integer upscale should not gather")
+    monkeypatch.setattr(effects, "_gather_nn", no_gather)
+    assert np.array_equal(sampler(frame), expected)
+
+
+def test_cropped_indices_still_gather():
+    from mlggen import effects
+    frame = np.arange(6 * 8 * 3, dtype=np.uint8).reshape(6, 8, 3)
+    row_idx, col_idx = effects._nn_indices(3, 4, 6, 8)
+    # Centre crop folded into the indices, as zoom_effect does
+    out = effects._nn_frame_sampler(row_idx + 1, col_idx + 2)(frame)
+    assert np.array_equal(out, frame[1:4, 2:6].repeat(2, axis=0).repeat(2, axis=1))
+
+
+def test_target_size_rounds_halves_up():
+    from mlggen.effects import _compute_target_size
+    # 5 * 0.5 = 2.5 -> 3 (round() would give 2); 3 * 0.5 = 1.5 -> 2
+    assert _compute_target_size(5, 3, factor=0.5) == (3, 2)
+    assert _compute_target_size(640, 360, width=10.5) == (11, 6)
+    assert _compute_target_size(640, 360, height=4.5) == (9, 5)
+
+
+def test_unreadable_music_keeps_the_source_audio(media, assets, tmp_path):
+    broken = tmp_path / "mtndew.mp3"
+    broken.write_bytes(b"not an mp3")
+    final = make_mlg_clip_sequence([media["a"], media["b"]], dict(assets, mtndew=str(broken)), seed=0)
+    assert final.audio is not None
+
+
+def test_near_identity_resize_is_relative(monkeypatch):
+    from moviepy.editor import ColorClip
+    from mlggen import effects
+    from mlggen.effects import safe_resize_clip
+    # The skip is decided before the PIL/numpy split; the numpy path needs no PIL version
+    monkeypatch.setattr(effects, "HAS_PIL", False)
+    small = ColorClip((40, 30), color=(255, 0, 0), duration=0.1)
+    assert tuple(safe_resize_clip(small, width=38).size) == (38, 29)
+    # A ~1300 px source capped to 1280 (about 1.5%) is not worth resampling
+    for size in ((1284, 720), (1300, 730)):
+        large = ColorClip(size, color=(255, 0, 0), duration=0.1)
+        assert safe_resize_clip(large, width=1280) is large
+
+
+def test_nearest_resample_is_honoured(tmp_path):
+    PILImage = pytest.importorskip("PIL.Image")
+    from mlggen.effects import safe_load_and_resize_image
+    # A checkerboard doubled with NEAREST (== 0) keeps only its two colours;
+    # LANCZOS would blend in intermediate values
+    board = (np.indices((4, 4)).sum(axis=0) % 2 * 255).astype(np.uint8)
+    path = str(tmp_path / "board.png")
+    PILImage.fromarray(board).save(path)
+    arr = safe_load_and_resize_image(path, 8, resample=PILImage.NEAREST)
+    assert set(np.unique(arr[..., 0])) == {0, 255}
+
+
+def test_flash_shares_a_read_only_frame():
+    from moviepy.editor import ColorClip
+    from mlggen.effects import _solid_frame, flash
+    flashed = flash(ColorClip((40, 30), color=(0, 0, 255), duration=1.0), flashes=4)
+    # Compositing reads the shared frame without writing to it
+    assert flashed.get_frame(0.01)[0, 0].tolist() == [255, 255, 255]
+    assert flashed.get_frame(0.1)[0, 0].tolist() == [0, 0, 255]
+    frame = _solid_frame(40, 30, (255, 255, 255))
+    assert not frame.flags.writeable
+    assert frame[0, 0].tolist() == [255, 255, 255]
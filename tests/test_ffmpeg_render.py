@@ -0,0 +1,135 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from mlggen import ffmpeg_render
+from mlggen.ffmpeg_utils import ffmpeg_binary, filter_options, system_ffmpeg_binary
+
+W, H, FPS = 160, 120, 24
+
+needs_system_ffmpeg = pytest.mark.skipif(system_ffmpeg_binary() is None, reason="no ffmpeg on PATH")
+needs_backend = pytest.mark.skipif(not ffmpeg_render.is_available(), reason="ffmpeg backend unavailable")
+
+
+def _frames(path, w=W, h=H):
+    raw = subprocess.run([ffmpeg_binary(), "-v", "error", "-i", path, "-f", "rawvideo", "-pix_fmt", "rgb24", "-"],
+                         stdout=subprocess.PIPE, check=True).stdout
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, h, w, 3).astype(np.int16)
+
+
+def _still_video(tmp_path):
+    # A static picture, so any change between output frames comes from the zoom
+    path = str(tmp_path / "still.mp4")
+    subprocess.run([ffmpeg_binary(), "-v", "error", "-y", "-f", "lavfi", "-i", "testsrc=s={}x{}:r={}".format(W, H, FPS),
+                    "-vf", "select=eq(n\\,0),loop=-1:1,setpts=N/{}/TB".format(FPS), "-t", "2",
+                    "-c:v", "libx264", "-pix_fmt", "yuv444p", path], check=True)
+    return path
+
+
+def _shot(path, **kw):
+    shot = {"info": {"path": path, "w": W, "h": H, "duration": 2.0, "fps": float(FPS), "has_audio": False},
+            "start": 0.0, "length": 2.0, "speed": 1.0, "color": None, "zoom": None, "duration": 2.0,
+            "doritos": False, "lensflare": False, "text": None, "airhorn": False}
+    shot.update(kw)
+    return shot
+
+
+@needs_system_ffmpeg
+def test_zoom_progresses_over_the_shot(tmp_path):
+    src = _still_video(tmp_path)
+    out = str(tmp_path / "zoom.mp4")
+    cmd = ffmpeg_render.build_command([_shot(src, zoom=1.5)], {}, out)
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+    frames = _frames(out)
+    # The zoom accumulates to 1.5x by the last frame. A zoom stuck at one increment
+    # (~1.01x on a still picture) leaves first and last frames nearly identical.
+    assert abs(frames[-1] - frames[0]).mean() > 30
+
+
+def test_unavailable_without_required_filters(monkeypatch):
+    monkeypatch.setattr(ffmpeg_render, "ffprobe_binary", lambda: "ffprobe")
+    monkeypatch.setattr(ffmpeg_render, "system_ffmpeg_binary", lambda: "ffmpeg")
+    monkeypatch.setattr(ffmpeg_render, "ffmpeg_filters", lambda binary: {"zoompan", "amix"})
+    monkeypatch.setattr(ffmpeg_render, "filter_options", lambda binary, name: {"normalize", "all"})
+    assert ffmpeg_render.missing_requirements() == ["drawtext filter"]
+    assert not ffmpeg_render.is_available()
+    with pytest.raises(RuntimeError, match="drawtext"):
+        ffmpeg_render.render_mlg_sequence(["a.mp4"], {}, "out.mp4")
+
+
+def test_unavailable_without_mix_options(monkeypatch):
+    # ffmpeg before 4.4 has amix but no normalize option, so the mix would fail to parse
+    monkeypatch.setattr(ffmpeg_render, "ffprobe_binary", lambda: "ffprobe")
+    monkeypatch.setattr(ffmpeg_render, "system_ffmpeg_binary", lambda: "ffmpeg")
+    monkeypatch.setattr(ffmpeg_render, "ffmpeg_filters", lambda binary: set(ffmpeg_render.REQUIRED_FILTERS) | {"adelay"})
+    monkeypatch.setattr(ffmpeg_render, "filter_options", lambda binary, name: {"inputs", "duration", "delays", "all"})
+    assert ffmpeg_render.missing_requirements() == ["amix normalize option"]
+
+
+@needs_system_ffmpeg
+def test_filter_options_lists_option_names():
+    options = filter_options(system_ffmpeg_binary(), "adelay")
+    assert "delays" in options
+    # Enum values under an option are not options themselves
+    assert "longest" not in filter_options(system_ffmpeg_binary(), "amix")
+
+
+@needs_backend
+def test_render_with_captions(media, assets, tmp_path):
+    out = str(tmp_path / "out.mp4")
+    ffmpeg_render.render_mlg_sequence([media["a"], media["b"]] * 3, assets, out, target_duration=20)
+    assert len(_frames(out, 320, 240)) > 0
+
+
+def _audio(path):
+    raw = subprocess.run([ffmpeg_binary(), "-v", "error", "-i", path, "-f", "f32le", "-ac", "2", "-ar", "44100", "-"],
+                         stdout=subprocess.PIPE, check=True).stdout
+    return np.frombuffer(raw, dtype=np.float32).reshape(-1, 2)
+
+
+@needs_system_ffmpeg
+def test_airhorns_leave_the_music_level_alone(media, tmp_path):
+    src = _still_video(tmp_path)
+    assets = {"mtndew": media["mtndew"], "airhorn": media["airhorn"]}
+    levels = []
+    for horns in (False, True):
+        out = str(tmp_path / "horns{}.mp4".format(int(horns)))
+        shots = [_shot(src, airhorn=horns), _shot(src, airhorn=horns)]
+        subprocess.run(ffmpeg_render.build_command(shots, assets, out), stdout=subprocess.DEVNULL, check=True)
+        # Both horns (0.5 s at t=0 and t=2) are over by 2.5 s; measure the bed after that
+        tail = _audio(out)[int(2.7 * 44100):int(3.7 * 44100)]
+        levels.append(np.sqrt((tail ** 2).mean(axis=0)))
+    # Same level on both channels as without horns
+    assert np.allclose(levels[1], levels[0], rtol=0.05)
+
+
+def _plan(seed):
+    infos = [{"path": "{}.mp4".format(i), "w": W, "h": H, "duration": 3.0, "fps": float(FPS), "has_audio": True}
+             for i in range(6)]
+    rng = np.random.default_rng(seed)
+    shots = ffmpeg_render._plan_shots(infos, target_duration=20, rng=rng)
+    ffmpeg_render._decorate_shots(shots, {"doritos": True, "lensflare": True, "airhorn": True}, rng=rng)
+    return ffmpeg_render.build_command(shots, {"doritos": "d.png", "lensflare": "l.png", "airhorn": "h.mp3"}, "o.mp4")
+
+
+def test_seed_reproduces_the_plan():
+    assert _plan(7) == _plan(7)
+    assert _plan(7) != _plan(8)
+
+
+def test_progress_ignores_the_pre_start_out_time(tmp_path):
+    script = tmp_path / "fake_ffmpeg.py"
+    script.write_text("print('out_time_us=-9223372036854775807')\nprint('out_time_ms=N/A')\n"
+                      "print('out_time_us=1000000')\nprint('progress=end')\n")
+    seen = []
+    returncode, _ = ffmpeg_render._run_with_progress([sys.executable, str(script)], 2.0, seen.append)
+    assert returncode == 0
+    assert seen == [0.5, 1.0]
+
+
+def test_encoder_preset_is_emitted_once():
+    cmd = ffmpeg_render.build_command([_shot("a.mp4")], {}, "o.mp4", encoder=("nvenc", "h264_nvenc", "p4", ["-tune", "hq"]))
+    assert cmd.count("-preset") == 1
+    assert cmd[cmd.index("-c:v"):cmd.index("-c:v") + 6] == ["-c:v", "h264_nvenc", "-preset", "p4", "-tune", "hq"]
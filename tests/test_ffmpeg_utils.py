@@ -0,0 +1,11 @@
+import pytest
+
+from mlggen import ffmpeg_utils
+
+
+@pytest.mark.parametrize("rate", ["0/0", "25/0", "0/1"])
+def test_unknown_frame_rate_falls_back_to_30(monkeypatch, rate):
+    info = {"streams": [{"codec_type": "video", "width": 320, "height": 240, "duration": "2.0",
+                         "r_frame_rate": rate}]}
+    monkeypatch.setattr(ffmpeg_utils, "_run_ffprobe", lambda path, args: info)
+    assert ffmpeg_utils.probe_video("clip.mp4")["fps"] == 30.0
@@ -0,0 +1,59 @@
+from queue import Empty
+
+import pytest
+
+pytest.importorskip("tkinter")
+pytest.importorskip("moviepy")
+
+from mlggen import gui
+
+
+class _Label:
+    text = ""
+
+    def config(self, text):
+        self.text = text
+
+
+class _Root:
+    def after(self, ms, func, *args):
+        raise AssertionError("should not poll a dead worker again")
+
+
+class _ExitedWorker:
+    exitcode = 0
+
+    def is_alive(self):
+        return False
+
+    def join(self):
+        pass
+
+
+class _LateQueue:
+    """
+    Empty on the first drain; the worker's last messages land right after it.
+    """
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.polls = 0
+
+    def get_nowait(self):
+        self.polls += 1
+        if self.polls == 1 or not self.messages:
+            raise Empty
+        return self.messages.pop(0)
+
+    def get(self, timeout=None):
+        return self.get_nowait()
+
+
+def test_done_sent_just_before_exit_is_success(monkeypatch):
+    shown = []
+    monkeypatch.setattr(gui.messagebox, "showinfo", lambda *a: shown.append(a))
+    monkeypatch.setattr(gui.messagebox, "showerror", lambda *a: shown.append(a))
+    app = gui.MLGGenGUI.__new__(gui.MLGGenGUI)
+    app.root, app.progress = _Root(), _Label()
+    app._drain_queue(_ExitedWorker(), _LateQueue([("progress", "Rendering..."), ("done", "out.mp4")]))
+    assert app.progress.text == "Done! Saved to: out.mp4"
+    assert [s[0] for s in shown] == ["Done"]
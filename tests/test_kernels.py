@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from mlggen import kernels
+
+pytestmark = pytest.mark.skipif(not kernels.HAS_NUMBA, reason="numba not installed")
+
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.int32])
+def test_warm_up_covers_read_only_frames(dtype):
+    # Decoded video frames come from np.frombuffer and are read-only
+    frame = np.frombuffer(bytes(24 * 32 * 3), dtype=np.uint8).reshape(24, 32, 3)
+    idx = np.arange(8, dtype=dtype)
+    out = np.empty((8, 8, 3), dtype=np.uint8)
+    lut = np.arange(256).astype(np.uint8)
+    compiled = (len(kernels.nn_resize.signatures), len(kernels.nn_resize_lut.signatures))
+    kernels.nn_resize(frame, idx, idx, out)
+    kernels.nn_resize_lut(frame, idx, idx, lut, out)
+    assert (len(kernels.nn_resize.signatures), len(kernels.nn_resize_lut.signatures)) == compiled